@@ -1,55 +1,116 @@
+import os
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 import plotly.express as px
 from datetime import datetime
+from tsdownsample import MinMaxLTTBDownsampler
 
 # Configuração da página
 st.set_page_config(page_title="Painel de Vendas (2018–2023)", layout="wide")
 
 # ----- 1) Leitura e preparação dos dados -----
 
+CSV_PATH = "vendas2018_2023.csv"
+PARQUET_PATH = "vendas.parquet"
+CAT_COLS = ['categoria', 'vendedor', 'fornecedor', 'produto', 'cliente']
+
+def build_dataset():
+    # Carregando o arquivo CSV (engine pyarrow: leitura em paralelo, multithread)
+    # O arquivo está no mesmo diretório, conforme contexto do usuário
+    # Tipos declarados na leitura para evitar a inferência e a conversão posterior
+    # (inteiros/floats de 32 bits e strings repetidas como category)
+    dtypes = {'quantidade': 'int32', 'valor_venda': 'float32', 'valor_custo': 'float32'}
+    dtypes.update({col: 'category' for col in CAT_COLS})
+    df = pd.read_csv(
+        CSV_PATH,
+        usecols=['data_venda', *dtypes],
+        dtype=dtypes,
+        parse_dates=['data_venda'],
+        date_format='%Y-%m-%d',
+        engine='pyarrow',
+    )
+    
+    # Criando colunas derivadas
+    df['ano'] = df['data_venda'].dt.year
+    df['mes'] = df['data_venda'].dt.month
+    # Formatando mês_ano como AAAA-MM para ordenação correta em gráficos
+    df['mes_ano'] = df['data_venda'].dt.to_period('M').astype(str)
+    
+    # Cálculos financeiros
+    # Totais em float64: somas em float32 perdem precisão na casa dos milhões
+    df['faturamento'] = df['quantidade'] * df['valor_venda'].astype('float64')
+    df['custo_total'] = df['quantidade'] * df['valor_custo'].astype('float64')
+    df['lucro'] = df['faturamento'] - df['custo_total']
+    
+    # Margem % (tratando divisão por zero)
+    fat = df['faturamento'].to_numpy(dtype='float64')
+    lucro = df['lucro'].to_numpy(dtype='float64')
+    df['margem_pct'] = np.divide(lucro, fat, out=np.zeros_like(fat), where=fat != 0)
+    
+    # Garantindo tipos numéricos
+    cols_num = ['quantidade', 'valor_venda', 'valor_custo', 'faturamento', 'custo_total', 'lucro', 'margem_pct']
+    for col in cols_num:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        
+    # Ordem estável por data: o filtro de período fatia o intervalo por busca binária
+    return df.sort_values('data_venda', kind='stable').reset_index(drop=True)
+
+def prepare_cache():
+    # Gera o Parquet (com as colunas derivadas já calculadas) apenas se ele
+    # não existir ou estiver mais antigo que o CSV de origem ou que este script.
+    # Retorna o DataFrame em memória se não for possível gravar o Parquet
+    # (ex.: diretório somente leitura); senão retorna None
+    source_mtime = max(os.path.getmtime(CSV_PATH), os.path.getmtime(__file__))
+    if os.path.exists(PARQUET_PATH) and os.path.getmtime(PARQUET_PATH) >= source_mtime:
+        return None
+    df = build_dataset()
+    # Escreve num arquivo temporário e troca de uma vez: uma falha no meio da escrita
+    # ou um leitor concorrente nunca veem um Parquet truncado
+    tmp_path = f"{PARQUET_PATH}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+        os.replace(tmp_path, PARQUET_PATH)
+    except OSError:
+        return df
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return None
+
 @st.cache_data
 def load_data():
+    # Retorna o DataFrame e um identificador do seu conteúdo (hash das linhas),
+    # calculado uma vez aqui e usado como chave dos caches que não hasheiam o DataFrame
     try:
-        # Carregando o arquivo CSV
-        # O arquivo está no mesmo diretório, conforme contexto do usuário
-        df = pd.read_csv("vendas2018_2023.csv")
-        
-        # Convertendo data_venda para datetime
-        df['data_venda'] = pd.to_datetime(df['data_venda'])
-        
-        # Criando colunas derivadas
-        df['ano'] = df['data_venda'].dt.year
-        df['mes'] = df['data_venda'].dt.month
-        # Formatando mês_ano como AAAA-MM para ordenação correta em gráficos
-        df['mes_ano'] = df['data_venda'].dt.to_period('M').astype(str)
-        
-        # Cálculos financeiros
-        df['faturamento'] = df['quantidade'] * df['valor_venda']
-        df['custo_total'] = df['quantidade'] * df['valor_custo']
-        df['lucro'] = df['faturamento'] - df['custo_total']
-        
-        # Margem % (tratando divisão por zero)
-        df['margem_pct'] = df.apply(
-            lambda x: (x['lucro'] / x['faturamento']) if x['faturamento'] != 0 else 0.0, 
-            axis=1
-        )
-        
-        # Garantindo tipos numéricos
-        cols_num = ['quantidade', 'valor_venda', 'valor_custo', 'faturamento', 'custo_total', 'lucro', 'margem_pct']
-        for col in cols_num:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            
-        return df.sort_values('data_venda')
+        df = prepare_cache()
+        if df is None:
+            df = pd.read_parquet(PARQUET_PATH, engine='pyarrow')
+        data_version = int(pd.util.hash_pandas_object(df, index=False).sum())
+        return df, data_version
     except FileNotFoundError:
         st.error("Arquivo 'vendas2018_2023.csv' não encontrado. Verifique se ele está na mesma pasta do app.py.")
-        return pd.DataFrame()
+        return pd.DataFrame(), None
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(), None
+
+@st.cache_data
+def filter_options(_df, data_version):
+    # Valores dos filtros calculados uma vez; nas colunas category as categorias
+    # já são os valores únicos ordenados. _df não é hasheado pelo Streamlit:
+    # a chave é só a identidade dos dados (data_version)
+    return {
+        'years': sorted(_df['ano'].unique().tolist()),
+        'cats': _df['categoria'].cat.categories.tolist(),
+        'sellers': _df['vendedor'].cat.categories.tolist(),
+        'suppliers': _df['fornecedor'].cat.categories.tolist(),
+        'products': _df['produto'].cat.categories.tolist(),
+    }
 
 # Carregar dados iniciais
-df_raw = load_data()
+df_raw, data_version = load_data()
 
 if df_raw.empty:
     st.stop()
@@ -69,10 +130,11 @@ end_date = st.sidebar.date_input("Data Final", max_date, min_value=min_date, max
 
 # Filtros Multiselect
 # Pré-ordenar valores únicos para facilitar busca
-all_years = sorted(df_raw['ano'].unique())
-all_cats = sorted(df_raw['categoria'].unique())
-all_sellers = sorted(df_raw['vendedor'].unique())
-all_suppliers = sorted(df_raw['fornecedor'].unique())
+options = filter_options(df_raw, data_version)
+all_years = options['years']
+all_cats = options['cats']
+all_sellers = options['sellers']
+all_suppliers = options['suppliers']
 
 selected_years = st.sidebar.multiselect("Ano", all_years, default=all_years)
 selected_cats = st.sidebar.multiselect("Categoria", all_cats, default=all_cats)
@@ -81,35 +143,73 @@ selected_suppliers = st.sidebar.multiselect("Fornecedor", all_suppliers, default
 
 # Filtro de Produto (Selectbox ou Multiselect)
 # Como podem ser muitos, vamos usar multiselect vazio = todos
-all_products = sorted(df_raw['produto'].unique())
+all_products = options['products']
 selected_products = st.sidebar.multiselect("Produto (Deixe vazio para todos)", all_products)
 
 # Filtro de Cliente (Texto)
 client_search = st.sidebar.text_input("Buscar Cliente (contém)")
 
 # --- Aplicar Filtros ---
-# Filtro de data
-mask_date = (df_raw['data_venda'].dt.date >= start_date) & (df_raw['data_venda'].dt.date <= end_date)
-df_filtered = df_raw.loc[mask_date]
+def isin_mask(series, selected):
+    # Colunas category: compara os códigos inteiros em vez de hashear as strings
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        wanted = series.cat.categories.get_indexer(selected)
+        return np.isin(series.cat.codes.to_numpy(), wanted[wanted >= 0])
+    return np.isin(series.to_numpy(), selected)
+
+def contains_mask(series, text):
+    # Busca de substring literal (sem regex, sem diferenciar maiúsculas) feita uma vez
+    # por nome distinto da category e aplicada às linhas pelos códigos
+    categories = series.cat.categories
+    return isin_mask(series, categories[categories.str.contains(text, case=False, regex=False)])
 
-# Filtros categóricos
-if selected_years:
-    df_filtered = df_filtered[df_filtered['ano'].isin(selected_years)]
+def dim_mask(df):
+    # Filtros categóricos combinados numa única máscara booleana;
+    # seleção vazia ou com todos os valores não filtra nada e é pulada
+    mask = np.ones(len(df), dtype=bool)
 
-if selected_cats:
-    df_filtered = df_filtered[df_filtered['categoria'].isin(selected_cats)]
+    if selected_years and len(selected_years) != len(all_years):
+        mask &= isin_mask(df['ano'], selected_years)
 
-if selected_sellers:
-    df_filtered = df_filtered[df_filtered['vendedor'].isin(selected_sellers)]
+    if selected_cats and len(selected_cats) != len(all_cats):
+        mask &= isin_mask(df['categoria'], selected_cats)
 
-if selected_suppliers:
-    df_filtered = df_filtered[df_filtered['fornecedor'].isin(selected_suppliers)]
+    if selected_sellers and len(selected_sellers) != len(all_sellers):
+        mask &= isin_mask(df['vendedor'], selected_sellers)
 
-if selected_products:
-    df_filtered = df_filtered[df_filtered['produto'].isin(selected_products)]
+    if selected_suppliers and len(selected_suppliers) != len(all_suppliers):
+        mask &= isin_mask(df['fornecedor'], selected_suppliers)
 
-if client_search:
-    df_filtered = df_filtered[df_filtered['cliente'].str.contains(client_search, case=False, na=False)]
+    if selected_products and len(selected_products) != len(all_products):
+        mask &= isin_mask(df['produto'], selected_products)
+
+    return mask
+
+def compute_filtered():
+    # Filtro de data: df_raw vem ordenado por data_venda, então o período é uma fatia
+    # contígua localizada por busca binária (fim exclusivo no dia seguinte)
+    start_ts = pd.Timestamp(start_date)
+    end_ts = pd.Timestamp(end_date)
+    lo, hi = df_raw['data_venda'].searchsorted([start_ts, end_ts + pd.Timedelta(days=1)], side='left')
+    df_period = df_raw.iloc[lo:hi]
+
+    # Categóricos e cliente avaliados juntos; as linhas são copiadas uma única vez
+    mask = dim_mask(df_period)
+
+    if client_search:
+        mask &= contains_mask(df_period['cliente'], client_search)
+
+    return df_period.loc[mask]
+
+# O resultado dos filtros fica na sessão: reexecuções que não mudam nenhum filtro
+# (ex.: slider da tabela, download) reaproveitam as linhas já filtradas.
+# data_version entra na chave para que uma recarga dos dados invalide o resultado salvo
+filter_key = (data_version, start_date, end_date, tuple(selected_years), tuple(selected_cats), tuple(selected_sellers),
+              tuple(selected_suppliers), tuple(selected_products), client_search)
+if st.session_state.get('filter_key') != filter_key:
+    st.session_state['df_filtered'] = compute_filtered()
+    st.session_state['filter_key'] = filter_key
+df_filtered = st.session_state['df_filtered']
 
 
 # Título Principal
@@ -130,14 +230,23 @@ total_qtd = df_filtered['quantidade'].sum()
 num_vendas = len(df_filtered)
 ticket_medio = (total_faturamento / num_vendas) if num_vendas > 0 else 0
 
+# Formato brasileiro: troca os separadores de milhar e decimal numa única passada
+BR_SEPARATORS = str.maketrans(',.', '.,')
+
+def brl(val):
+    return f"R$ {val:,.2f}".translate(BR_SEPARATORS)
+
+def br_int(val):
+    return f"{val:,}".translate(BR_SEPARATORS)
+
 c1, c2, c3, c4, c5, c6 = st.columns(6)
 
-c1.metric("Faturamento Total", f"R$ {total_faturamento:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
-c2.metric("Lucro Total", f"R$ {total_lucro:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+c1.metric("Faturamento Total", brl(total_faturamento))
+c2.metric("Lucro Total", brl(total_lucro))
 c3.metric("Margem Global", f"{margem_global:.1%}")
-c4.metric("Qtd. Vendida", f"{total_qtd:,}".replace(",", "."))
-c5.metric("Nº Vendas", f"{num_vendas:,}".replace(",", "."))
-c6.metric("Ticket Médio", f"R$ {ticket_medio:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+c4.metric("Qtd. Vendida", br_int(total_qtd))
+c5.metric("Nº Vendas", br_int(num_vendas))
+c6.metric("Ticket Médio", brl(ticket_medio))
 
 st.markdown("---")
 
@@ -148,95 +257,151 @@ st.subheader("Análises Gráficas")
 def format_currency(val):
     return f"R$ {val:,.2f}"
 
+MAX_LINE_POINTS = 1000
+
+def downsample(df, col, n_out=MAX_LINE_POINTS):
+    # Reduz séries longas (MinMaxLTTB) preservando o formato da curva
+    if len(df) <= n_out:
+        return df
+    idx = MinMaxLTTBDownsampler().downsample(df[col].to_numpy(), n_out=n_out)
+    return df.iloc[idx]
+
+def topn_plus_other(s, n=10):
+    # Mantém os n maiores e soma o restante numa fatia "Outros"
+    top = s.nlargest(n)
+    if len(s) <= n:
+        return top
+    other = s.drop(top.index).sum()
+    # Evita rótulo duplicado se já existir uma categoria/vendedor chamado "Outros"
+    label = 'Outros'
+    while label in s.index:
+        label = f'{label} (demais)'
+    return pd.concat([top, pd.Series({label: other})])
+
+@st.cache_data(max_entries=64)
+def build_figures(_df, filter_key):
+    # Figuras cacheadas pela chave dos filtros: mesmos filtros reaproveitam as figuras prontas.
+    # O cache é global e limitado a 64 combinações para não crescer sem fim no servidor.
+    # As linhas filtradas (_df) não são hasheadas; elas são determinadas por filter_key
+    figs = {}
+
+    # Agrupamentos compartilhados: faturamento e lucro somados no mesmo groupby
+    por_mes = _df.groupby('mes_ano', observed=True)[['faturamento', 'lucro']].sum().sort_index()
+    por_cat = _df.groupby('categoria', observed=True)[['faturamento', 'lucro']].sum()
+
+    # (1) Linha: Faturamento por mês_ano
+    fat_por_mes = por_mes['faturamento'].reset_index()
+    figs['fat_mes'] = px.line(downsample(fat_por_mes, 'faturamento'), x='mes_ano', y='faturamento', markers=True, 
+                              labels={'mes_ano': 'Mês/Ano', 'faturamento': 'Faturamento (R$)'})
+
+    # (2) Linha: Lucro por mês_ano
+    lucro_por_mes = por_mes['lucro'].reset_index()
+    figs['lucro_mes'] = px.line(downsample(lucro_por_mes, 'lucro'), x='mes_ano', y='lucro', markers=True, color_discrete_sequence=['green'],
+                                labels={'mes_ano': 'Mês/Ano', 'lucro': 'Lucro (R$)'})
+
+    # (3) Barras: Top 10 categorias por faturamento
+    fat_por_cat = por_cat['faturamento'].nlargest(10).reset_index()
+    figs['top_cat'] = px.bar(fat_por_cat, x='faturamento', y='categoria', orientation='h', text_auto='.2s',
+                             labels={'faturamento': 'Faturamento', 'categoria': 'Categoria'})
+    figs['top_cat'].update_layout(yaxis={'categoryorder':'total ascending'})
+
+    # (4) Rosca: Participação do faturamento por categoria
+    # Se forem muitas categorias a rosca fica ilegível: Top 10 + Outros
+    fat_cat_share = topn_plus_other(por_cat['faturamento']).rename_axis('categoria').reset_index(name='faturamento')
+    figs['share_cat'] = px.pie(fat_cat_share, names='categoria', values='faturamento', hole=0.5)
+
+    # (5) Treemap: Top 10 vendedores por faturamento (+ Outros)
+    fat_por_vend = _df.groupby('vendedor', observed=True)['faturamento'].sum()
+    fat_por_vend = topn_plus_other(fat_por_vend).rename_axis('vendedor').reset_index(name='faturamento')
+    figs['top_vend'] = px.treemap(fat_por_vend, path=['vendedor'], values='faturamento',
+                                  labels={'faturamento': 'Faturamento', 'vendedor': 'Vendedor'})
+
+    # (6) Barras: Top 10 produtos por faturamento
+    fat_por_prod = _df.groupby('produto', observed=True)['faturamento'].sum().nlargest(10).reset_index()
+    figs['top_prod'] = px.bar(fat_por_prod, x='faturamento', y='produto', orientation='h',
+                              labels={'faturamento': 'Faturamento', 'produto': 'Produto'})
+    figs['top_prod'].update_layout(yaxis={'categoryorder':'total ascending'})
+
+    # (7) Pizza: Participação do lucro por categoria (ou fornecedor)
+    # Vamos usar Categoria como padrão
+    lucro_por_cat = por_cat['lucro'].reset_index()
+    # Se houver lucro negativo em alguma categoria, pizza pode ficar estranha, mas plotly lida ou normaliza.
+    # Vamos filtrar lucros positivos para evitar erro visual grave na pizza ou usar bar se tiver negativo
+    figs['lucro_negativo'] = bool((lucro_por_cat['lucro'] < 0).any())
+    if figs['lucro_negativo']:
+        figs['lucro_cat'] = px.bar(lucro_por_cat, x='categoria', y='lucro')
+    else:
+        figs['lucro_cat'] = px.pie(lucro_por_cat, names='categoria', values='lucro', hole=0.0)
+
+    # (8) Barras Empilhadas: Faturamento por ano e categoria
+    fat_ano_cat = _df.groupby(['ano', 'categoria'], observed=True)['faturamento'].sum().reset_index()
+    figs['ano_cat'] = px.bar(fat_ano_cat, x='ano', y='faturamento', color='categoria', 
+                             labels={'ano': 'Ano', 'faturamento': 'Faturamento'}, barmode='stack')
+    # Forçar eixo X a mostrar apenas anos inteiros se forem poucos
+    figs['ano_cat'].update_xaxes(dtick="M12") 
+
+    return figs
+
+figs = build_figures(df_filtered, filter_key)
+
 # Layout de colunas para gráficos
 g_col1, g_col2 = st.columns(2)
 
 with g_col1:
-    # (1) Linha: Faturamento por mês_ano
     st.markdown("#### Faturamento por Mês")
-    fat_por_mes = df_filtered.groupby('mes_ano')['faturamento'].sum().reset_index().sort_values('mes_ano')
-    fig1 = px.line(fat_por_mes, x='mes_ano', y='faturamento', markers=True, 
-                   labels={'mes_ano': 'Mês/Ano', 'faturamento': 'Faturamento (R$)'})
-    st.plotly_chart(fig1, use_container_width=True)
+    st.plotly_chart(figs['fat_mes'], width='stretch')
     
-    # (3) Barras: Top 10 categorias por faturamento
     st.markdown("#### Top 10 Categorias (Faturamento)")
-    fat_por_cat = df_filtered.groupby('categoria')['faturamento'].sum().reset_index().sort_values('faturamento', ascending=False).head(10)
-    fig3 = px.bar(fat_por_cat, x='faturamento', y='categoria', orientation='h', text_auto='.2s',
-                  labels={'faturamento': 'Faturamento', 'categoria': 'Categoria'})
-    fig3.update_layout(yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig3, use_container_width=True)
+    st.plotly_chart(figs['top_cat'], width='stretch')
     
-    # (5) Treemap: Top 10 vendedores por faturamento
-    st.markdown("#### Top 10 Vendedores (Faturamento)")
-    fat_por_vend = df_filtered.groupby('vendedor')['faturamento'].sum().reset_index().sort_values('faturamento', ascending=False).head(10)
-    fig5 = px.treemap(fat_por_vend, path=['vendedor'], values='faturamento',
-                      labels={'faturamento': 'Faturamento', 'vendedor': 'Vendedor'})
-    st.plotly_chart(fig5, use_container_width=True)
+    st.markdown("#### Top 10 Vendedores + Outros (Faturamento)")
+    st.plotly_chart(figs['top_vend'], width='stretch')
 
-    # (7) Pizza: Participação do lucro por categoria (ou fornecedor)
-    # Vamos usar Categoria como padrão
     st.markdown("#### Distribuição de Lucro por Categoria")
-    lucro_por_cat = df_filtered.groupby('categoria')['lucro'].sum().reset_index()
-    # Se houver lucro negativo em alguma categoria, pizza pode ficar estranha, mas plotly lida ou normaliza.
-    # Vamos filtrar lucros positivos para evitar erro visual grave na pizza ou usar bar se tiver negativo
-    if (lucro_por_cat['lucro'] < 0).any():
+    if figs['lucro_negativo']:
         st.warning("Existem categorias com lucro negativo, exibindo gráfico de barras.")
-        fig7 = px.bar(lucro_por_cat, x='categoria', y='lucro')
-    else:
-        fig7 = px.pie(lucro_por_cat, names='categoria', values='lucro', hole=0.0)
-    st.plotly_chart(fig7, use_container_width=True)
+    st.plotly_chart(figs['lucro_cat'], width='stretch')
 
 with g_col2:
-    # (2) Linha: Lucro por mês_ano
     st.markdown("#### Lucro por Mês")
-    lucro_por_mes = df_filtered.groupby('mes_ano')['lucro'].sum().reset_index().sort_values('mes_ano')
-    fig2 = px.line(lucro_por_mes, x='mes_ano', y='lucro', markers=True, color_discrete_sequence=['green'],
-                   labels={'mes_ano': 'Mês/Ano', 'lucro': 'Lucro (R$)'})
-    st.plotly_chart(fig2, use_container_width=True)
+    st.plotly_chart(figs['lucro_mes'], width='stretch')
 
-    # (4) Rosca: Participação do faturamento por categoria
     st.markdown("#### Share Faturamento por Categoria")
-    # Agrupamento já feito em fat_por_cat, mas aqui queremos de todas as categorias, não só top 10?
-    # O pedido diz "Participação ... por categoria". Se forem muitas, fica ruim. Vamos mostrar as Top 10 + Outros se necessário.
-    # Simplificando: usar as mesmas do dataframe completo filtrado
-    fat_cat_share = df_filtered.groupby('categoria')['faturamento'].sum().reset_index()
-    fig4 = px.pie(fat_cat_share, names='categoria', values='faturamento', hole=0.5)
-    st.plotly_chart(fig4, use_container_width=True)
+    st.plotly_chart(figs['share_cat'], width='stretch')
 
-    # (6) Barras: Top 10 produtos por faturamento
     st.markdown("#### Top 10 Produtos (Faturamento)")
-    fat_por_prod = df_filtered.groupby('produto')['faturamento'].sum().reset_index().sort_values('faturamento', ascending=False).head(10)
-    fig6 = px.bar(fat_por_prod, x='faturamento', y='produto', orientation='h',
-                  labels={'faturamento': 'Faturamento', 'produto': 'Produto'})
-    fig6.update_layout(yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig6, use_container_width=True)
+    st.plotly_chart(figs['top_prod'], width='stretch')
 
-    # (8) Barras Empilhadas: Faturamento por ano e categoria
     st.markdown("#### Comparação Anual por Categoria")
-    fat_ano_cat = df_filtered.groupby(['ano', 'categoria'])['faturamento'].sum().reset_index()
-    fig8 = px.bar(fat_ano_cat, x='ano', y='faturamento', color='categoria', 
-                  labels={'ano': 'Ano', 'faturamento': 'Faturamento'}, barmode='stack')
-    # Forçar eixo X a mostrar apenas anos inteiros se forem poucos
-    fig8.update_xaxes(dtick="M12") 
-    st.plotly_chart(fig8, use_container_width=True)
+    st.plotly_chart(figs['ano_cat'], width='stretch')
 
 st.markdown("---")
 
 # ----- 5) Tabela Detalhada -----
 st.subheader("Base de Dados Detalhada")
 cols_view = ['data_venda', 'cliente', 'vendedor', 'produto', 'categoria', 'fornecedor', 'quantidade', 'valor_venda', 'valor_custo', 'faturamento', 'lucro', 'margem_pct']
-df_display = df_filtered[cols_view].copy()
+df_display = df_filtered[cols_view]
 
 # Formatando para exibição (apenas visual, mas dataframe pandas st mostra bem numbers)
 # Vamos deixar o dataframe interativo nativo do Streamlit
-st.dataframe(df_display, use_container_width=True)
+# Só as primeiras linhas vão para o navegador; o slider libera mais sob demanda
+TABLE_PAGE_ROWS = 10_000
+n_rows = TABLE_PAGE_ROWS
+if len(df_display) > TABLE_PAGE_ROWS:
+    max_rows = -(-len(df_display) // TABLE_PAGE_ROWS) * TABLE_PAGE_ROWS
+    n_rows = st.slider("Exibir mais linhas", TABLE_PAGE_ROWS, max_rows, TABLE_PAGE_ROWS, step=TABLE_PAGE_ROWS)
+    st.caption(f"Exibindo {br_int(min(n_rows, len(df_display)))} de {br_int(len(df_display))} linhas.")
+table = pa.Table.from_pandas(df_display.head(n_rows), preserve_index=False)
+st.dataframe(table, width='stretch')
 
 # Botão de Download
-csv = df_display.to_csv(index=False).encode('utf-8')
+def make_csv():
+    # Gerado só no clique (Streamlit chama a função), no mesmo formato de antes
+    return df_display.to_csv(index=False).encode('utf-8')
+
 st.download_button(
     label="Baixar Dados Filtrados (CSV)",
-    data=csv,
+    data=make_csv,
     file_name='vendas_filtradas.csv',
     mime='text/csv',
 )